@@ -1,47 +1,95 @@
 """Database initialization and management."""
 
-import os
 import logging
-from sqlalchemy import create_engine, inspect
-from sqlalchemy.orm import sessionmaker
+import functools
+from sqlalchemy import inspect
 from models.base import Base, engine
-from models import ServerInstance, ConfigurationTemplate, ConfigurationEntry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EXPECTED_TABLES = frozenset(["server_instances", "configuration_templates", "configuration_entries"])
+
+# str(engine.url) re-renders (and masks) the URL each call; do it once
+_ENGINE_URL_STR = str(engine.url)
+
+# Bumped whenever the schema changes so stale inspector results are not reused
+_schema_version = 0
+
+
+_tables_cache = {}
+
+
+def _cached_tables(schema_version):
+    """Get table names for the given schema version.
+
+    Only a complete schema is cached: another process (e.g. the container's
+    ``database.py init`` step) may still create the missing tables, and
+    that never bumps this process's schema version.
+    """
+    tables = _tables_cache.get(schema_version)
+    if tables is None:
+        tables = frozenset(inspect(engine).get_table_names())
+        if EXPECTED_TABLES <= tables:
+            _tables_cache.clear()
+            _tables_cache[schema_version] = tables
+    return tables
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_columns(schema_version, table_name):
+    """Get (name, type) column pairs of a table for the given schema version.
+
+    Always reflected from the database, so schema drift shows up in the
+    output; the cache makes that a one-time cost per schema version.
+    """
+    return tuple((col["name"], str(col["type"])) for col in inspect(engine).get_columns(table_name))
+
+
+def invalidate_schema_cache():
+    """Discard cached inspector results after the schema has changed."""
+    global _schema_version
+    _schema_version += 1
+    _tables_cache.clear()
+    _cached_columns.cache_clear()
+
+
+def _register_models():
+    """Import the model modules so their tables are registered on Base.metadata."""
+    import models.server  # noqa: F401
+    import models.configuration  # noqa: F401
+
 
 def init_database():
     """Initialize the database by creating all tables."""
     try:
         logger.info("Initializing database...")
+        _register_models()
         
         # Create all tables
         Base.metadata.create_all(bind=engine)
+        invalidate_schema_cache()
         
         logger.info("Database initialized successfully")
         return True
         
     except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
+        logger.error("Failed to initialize database: %s", e)
         return False
 
 
 def check_database_exists():
     """Check if database tables exist."""
     try:
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
+        tables = _cached_tables(_schema_version)
+        existing_tables = EXPECTED_TABLES & tables
         
-        expected_tables = ["server_instances", "configuration_templates", "configuration_entries"]
-        existing_tables = [table for table in expected_tables if table in tables]
-        
-        logger.info(f"Found {len(existing_tables)} of {len(expected_tables)} expected tables")
-        return len(existing_tables) == len(expected_tables)
+        logger.info("Found %d of %d expected tables", len(existing_tables), len(EXPECTED_TABLES))
+        return EXPECTED_TABLES.issubset(tables)
         
     except Exception as e:
-        logger.error(f"Failed to check database: {e}")
+        logger.error("Failed to check database: %s", e)
         return False
 
 
@@ -49,6 +97,7 @@ def reset_database():
     """Reset the database by dropping and recreating all tables."""
     try:
         logger.warning("Resetting database - all data will be lost!")
+        _register_models()
         
         # Drop all tables
         Base.metadata.drop_all(bind=engine)
@@ -56,78 +105,93 @@ def reset_database():
         
         # Recreate all tables
         Base.metadata.create_all(bind=engine)
+        invalidate_schema_cache()
         logger.info("Recreated all tables")
         
         return True
         
     except Exception as e:
-        logger.error(f"Failed to reset database: {e}")
+        logger.error("Failed to reset database: %s", e)
         return False
 
 
 def get_database_info():
     """Get information about the current database."""
     try:
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
+        tables = _cached_tables(_schema_version)
         
         info = {
-            "database_url": str(engine.url),
+            "database_url": _ENGINE_URL_STR,
             "tables": []
         }
         
-        for table_name in tables:
-            columns = inspector.get_columns(table_name)
+        for table_name in sorted(tables):
+            columns = _cached_columns(_schema_version, table_name)
             info["tables"].append({
                 "name": table_name,
-                "columns": [{"name": col["name"], "type": str(col["type"])} for col in columns]
+                "columns": [{"name": name, "type": col_type} for name, col_type in columns]
             })
         
         return info
         
     except Exception as e:
-        logger.error(f"Failed to get database info: {e}")
+        logger.error("Failed to get database info: %s", e)
         return None
 
 
+def _cli_init():
+    return 0 if init_database() else 1
+
+
+def _cli_reset():
+    return 0 if reset_database() else 1
+
+
+def _cli_check():
+    exists = check_database_exists()
+    print(f"Database properly initialized: {exists}")
+    return 0 if exists else 1
+
+
+def _cli_info():
+    info = get_database_info()
+    if info:
+        print(f"Database URL: {info['database_url']}")
+        print(f"Tables: {len(info['tables'])}")
+        for table in info["tables"]:
+            print(f"  - {table['name']}: {len(table['columns'])} columns")
+    return 0 if info else 1
+
+
+def _cli_default():
+    # Default behavior: initialize if not exists
+    if not check_database_exists():
+        return _cli_init()
+    logger.info("Database already initialized")
+    return 0
+
+
+CLI_COMMANDS = {
+    "init": _cli_init,
+    "reset": _cli_reset,
+    "check": _cli_check,
+    "info": _cli_info,
+}
+
+
 if __name__ == "__main__":
     """Run database initialization when script is executed directly."""
     import sys
     
     if len(sys.argv) > 1:
         command = sys.argv[1].lower()
+        handler = CLI_COMMANDS.get(command)
         
-        if command == "init":
-            success = init_database()
-            sys.exit(0 if success else 1)
-            
-        elif command == "reset":
-            success = reset_database()
-            sys.exit(0 if success else 1)
-            
-        elif command == "check":
-            exists = check_database_exists()
-            print(f"Database properly initialized: {exists}")
-            sys.exit(0 if exists else 1)
-            
-        elif command == "info":
-            info = get_database_info()
-            if info:
-                print(f"Database URL: {info['database_url']}")
-                print(f"Tables: {len(info['tables'])}")
-                for table in info["tables"]:
-                    print(f"  - {table['name']}: {len(table['columns'])} columns")
-            sys.exit(0 if info else 1)
-            
-        else:
+        if handler is None:
             print(f"Unknown command: {command}")
-            print("Available commands: init, reset, check, info")
+            print(f"Available commands: {', '.join(CLI_COMMANDS)}")
             sys.exit(1)
+        
+        sys.exit(handler())
     else:
-        # Default behavior: initialize if not exists
-        if not check_database_exists():
-            success = init_database()
-            sys.exit(0 if success else 1)
-        else:
-            logger.info("Database already initialized")
-            sys.exit(0)
\ No newline at end of file
+        sys.exit(_cli_default())
@@ -1,18 +1,16 @@
 """Demonstration script showing model usage."""
 
-from sqlalchemy.orm import sessionmaker
-from models.base import engine
+from sqlalchemy import insert, delete
+from sqlalchemy.orm import joinedload, selectinload
+from models.base import SessionLocal
 from models.server import ServerInstance, ServerStatus
-from models.configuration import ConfigurationTemplate, ConfigurationEntry, ConfigType, UIControlType
+from models.configuration import ConfigurationTemplate, ConfigurationEntry, ConfigType, UIControlType, validate_entry_fields
 import uuid
 
-# Create session
-Session = sessionmaker(bind=engine)
-
 
 def demo_model_usage():
     """Demonstrate typical model usage patterns."""
-    session = Session()
+    session = SessionLocal()
 
     try:
         print("ContainerCraft Model Demonstration")
@@ -45,8 +43,9 @@ def demo_model_usage():
             return
 
         session.add(template)
-        session.commit()
-        print(f"✓ Created template: {template.name} (ID: {template.id})")
+        session.flush()  # assign the primary key without committing
+        template_id = template.id
+        print(f"✓ Created template: {template.name} (ID: {template_id})")
 
         # 2. Create a server instance
         print("\n2. Creating server instance...")
@@ -57,7 +56,7 @@ def demo_model_usage():
             port=25565,
             rcon_port=25575,
             rcon_password="secure_password_123",
-            configuration_id=template.id
+            configuration_id=template_id
         )
 
         # Validate server
@@ -67,63 +66,79 @@ def demo_model_usage():
             return
 
         session.add(server)
-        session.commit()
-        print(f"✓ Created server: {server.name} (ID: {server.id})")
+        session.flush()
+        server_id = server.id  # read before commit expires the instance
+        print(f"✓ Created server: {server.name} (ID: {server_id})")
 
         # 3. Create configuration entries
         print("\n3. Creating configuration entries...")
 
         config_entries = [
-            ConfigurationEntry(
-                server_id=server.id,
-                file_path="server.properties",
-                key="max-players",
-                value="20",
-                value_type=ConfigType.INTEGER,
-                ui_control=UIControlType.SLIDER,
-                min_value=1,
-                max_value=100,
-                description="Maximum number of players allowed on the server"
-            ),
-            ConfigurationEntry(
-                server_id=server.id,
-                file_path="server.properties",
-                key="difficulty",
-                value="normal",
-                value_type=ConfigType.ENUM,
-                ui_control=UIControlType.DROPDOWN,
-                options=["peaceful", "easy", "normal", "hard"],
-                description="Server difficulty level"
-            ),
-            ConfigurationEntry(
-                server_id=server.id,
-                file_path="server.properties",
-                key="pvp",
-                value="true",
-                value_type=ConfigType.BOOLEAN,
-                ui_control=UIControlType.TOGGLE,
-                description="Enable player vs player combat"
-            )
+            {
+                "server_id": server_id,
+                "file_path": "server.properties",
+                "key": "max-players",
+                "value": "20",
+                "value_type": ConfigType.INTEGER,
+                "ui_control": UIControlType.SLIDER,
+                "min_value": 1,
+                "max_value": 100,
+                "description": "Maximum number of players allowed on the server"
+            },
+            {
+                "server_id": server_id,
+                "file_path": "server.properties",
+                "key": "difficulty",
+                "value": "normal",
+                "value_type": ConfigType.ENUM,
+                "ui_control": UIControlType.DROPDOWN,
+                "options": ["peaceful", "easy", "normal", "hard"],
+                "description": "Server difficulty level"
+            },
+            {
+                "server_id": server_id,
+                "file_path": "server.properties",
+                "key": "pvp",
+                "value": "true",
+                "value_type": ConfigType.BOOLEAN,
+                "ui_control": UIControlType.TOGGLE,
+                "description": "Enable player vs player combat"
+            }
         ]
 
-        for entry in config_entries:
-            errors = entry.validate()
+        valid_entries = []
+        for values in config_entries:
+            errors = validate_entry_fields(**values)
             if errors:
-                print(f"Entry validation errors for {entry.key}: {errors}")
+                print(f"Entry validation errors for {values['key']}: {errors}")
                 continue
 
-            session.add(entry)
+            valid_entries.append(values)
             print(
-                f"✓ Added config entry: {entry.key} = {entry.value} ({entry.ui_control.value})")
-
+                f"✓ Added config entry: {values['key']} = {values['value']} ({values['ui_control'].value})")
+
+        # Insert all entries in one executemany instead of one flush per object
+        entry_ids = []
+        if valid_entries:
+            entry_ids = session.execute(
+                insert(ConfigurationEntry).returning(ConfigurationEntry.id),
+                valid_entries
+            ).scalars().all()
+        print(f"✓ Inserted {len(entry_ids)} config entries")
+
+        # Commit template, server and entries as one transaction
         session.commit()
 
         # 4. Demonstrate relationships and queries
         print("\n4. Testing relationships and queries...")
 
-        # Load server with relationships
-        loaded_server = session.query(ServerInstance).filter_by(
-            name="My Survival Server").first()
+        # The committed server is already in the identity map; reload its
+        # expired state by primary key with relationships eager-loaded
+        # (one JOIN + one IN query) instead of re-querying by name
+        loaded_server = session.get(ServerInstance, server_id, options=[
+            joinedload(ServerInstance.configuration_template).undefer_group("details"),
+            selectinload(ServerInstance.configuration_entries)
+        ], populate_existing=True)
         print(f"✓ Loaded server: {loaded_server.name}")
         print(f"  - Template: {loaded_server.configuration_template.name}")
         print(
@@ -157,10 +172,11 @@ def demo_model_usage():
 
         # Cleanup
         print("\n7. Cleaning up demo data...")
-        for entry in config_entries:
-            session.delete(entry)
-        session.delete(server)
-        session.delete(template)
+        session.execute(
+            delete(ConfigurationEntry).where(ConfigurationEntry.server_id == server_id))
+        session.execute(delete(ServerInstance).where(ServerInstance.id == server_id))
+        session.execute(
+            delete(ConfigurationTemplate).where(ConfigurationTemplate.id == template_id))
         session.commit()
         print("✓ Demo data cleaned up")
 
@@ -3,12 +3,37 @@
 import os
 import logging
 from datetime import datetime
-from sqlalchemy import text, inspect
+from sqlalchemy import Integer, MetaData, SmallInteger, String, Table, text, inspect
+from sqlalchemy.schema import CreateIndex, CreateTable
 from models.base import engine
+from models.configuration import _CONFIG_TYPE_CODES, _UI_CONTROL_CODES
+from database import invalidate_schema_cache
 
 logger = logging.getLogger(__name__)
 
 
+def run_ddl_script(sql: str):
+    """Run a multi-statement DDL script in one batch.
+
+    SQLite executes the whole script with ``executescript``; other dialects
+    run each ``;``-separated statement inside a single transaction. Statements
+    must not contain literal semicolons.
+    """
+    if engine.dialect.name == "sqlite":
+        raw = engine.raw_connection()
+        try:
+            raw.driver_connection.executescript(sql)
+            raw.commit()
+        finally:
+            raw.close()
+        return
+    
+    with engine.begin() as conn:
+        for statement in sql.split(";"):
+            if statement.strip():
+                conn.exec_driver_sql(statement)
+
+
 class Migration:
     """Base migration class."""
     
@@ -31,23 +56,23 @@ class MigrationManager:
     
     def __init__(self):
         self.migrations = []
+        self._by_version = {}
         self._ensure_migration_table()
     
     def _ensure_migration_table(self):
         """Create migration tracking table if it doesn't exist."""
-        with engine.connect() as conn:
-            conn.execute(text("""
-                CREATE TABLE IF NOT EXISTS schema_migrations (
-                    version VARCHAR(50) PRIMARY KEY,
-                    description TEXT,
-                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """))
-            conn.commit()
+        run_ddl_script("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(50) PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
     
     def register_migration(self, migration: Migration):
         """Register a migration."""
         self.migrations.append(migration)
+        self._by_version[migration.version] = migration
         # Sort by version to ensure proper order
         self.migrations.sort(key=lambda m: m.version)
     
@@ -62,35 +87,36 @@ class MigrationManager:
         applied = set(self.get_applied_migrations())
         return [m for m in self.migrations if m.version not in applied]
     
+    def _record_migration(self, conn, migration: Migration):
+        """Record a migration as applied."""
+        conn.execute(text("""
+            INSERT INTO schema_migrations (version, description) 
+            VALUES (:version, :description)
+        """), {"version": migration.version, "description": migration.description})
+    
     def apply_migration(self, migration: Migration):
         """Apply a single migration."""
         try:
-            logger.info(f"Applying migration {migration.version}: {migration.description}")
+            logger.info("Applying migration %s: %s", migration.version, migration.description)
             
             with engine.begin() as conn:
                 # Apply the migration
                 migration.up()
                 
                 # Record the migration
-                conn.execute(text("""
-                    INSERT INTO schema_migrations (version, description) 
-                    VALUES (:version, :description)
-                """), {
-                    "version": migration.version,
-                    "description": migration.description
-                })
+                self._record_migration(conn, migration)
             
-            logger.info(f"Successfully applied migration {migration.version}")
+            logger.info("Successfully applied migration %s", migration.version)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to apply migration {migration.version}: {e}")
+            logger.error("Failed to apply migration %s: %s", migration.version, e)
             return False
     
     def rollback_migration(self, migration: Migration):
         """Rollback a single migration."""
         try:
-            logger.info(f"Rolling back migration {migration.version}: {migration.description}")
+            logger.info("Rolling back migration %s: %s", migration.version, migration.description)
             
             with engine.begin() as conn:
                 # Rollback the migration
@@ -101,11 +127,11 @@ class MigrationManager:
                     DELETE FROM schema_migrations WHERE version = :version
                 """), {"version": migration.version})
             
-            logger.info(f"Successfully rolled back migration {migration.version}")
+            logger.info("Successfully rolled back migration %s", migration.version)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to rollback migration {migration.version}: {e}")
+            logger.error("Failed to rollback migration %s: %s", migration.version, e)
             return False
     
     def migrate_up(self):
@@ -116,11 +142,16 @@ class MigrationManager:
             logger.info("No pending migrations")
             return True
         
-        logger.info(f"Applying {len(pending)} pending migrations")
+        logger.info("Applying %d pending migrations", len(pending))
         
-        for migration in pending:
-            if not self.apply_migration(migration):
-                return False
+        # Each migration is recorded as soon as its up() succeeds, so a later
+        # failure never leaves earlier migrations applied but unrecorded
+        try:
+            for migration in pending:
+                if not self.apply_migration(migration):
+                    return False
+        finally:
+            invalidate_schema_cache()
         
         logger.info("All migrations applied successfully")
         return True
@@ -140,7 +171,7 @@ class MigrationManager:
                 break
             
             # Find the migration object
-            migration = next((m for m in self.migrations if m.version == version), None)
+            migration = self._by_version.get(version)
             if migration:
                 to_rollback.append(migration)
         
@@ -148,11 +179,14 @@ class MigrationManager:
             logger.info("No migrations to rollback")
             return True
         
-        logger.info(f"Rolling back {len(to_rollback)} migrations")
+        logger.info("Rolling back %d migrations", len(to_rollback))
         
-        for migration in to_rollback:
-            if not self.rollback_migration(migration):
-                return False
+        try:
+            for migration in to_rollback:
+                if not self.rollback_migration(migration):
+                    return False
+        finally:
+            invalidate_schema_cache()
         
         logger.info("Migrations rolled back successfully")
         return True
@@ -190,11 +224,182 @@ class InitialMigration(Migration):
         pass
 
 
+def _has_table(table_name: str) -> bool:
+    return inspect(engine).has_table(table_name)
+
+
+def _pg_type_exists(conn, type_name: str) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM pg_type WHERE typname = :name"), {"name": type_name}
+    ).first() is not None
+
+
+def _case_sql(column: str, mapping: dict) -> str:
+    """Render a CASE expression mapping each literal key of a column to its value."""
+    whens = " ".join(f"WHEN {old!r} THEN {new!r}" for old, new in mapping.items())
+    return f"CASE {column} {whens} END"
+
+
+def _sqlite_rebuild_script(table_name: str, retypes: dict) -> str:
+    """Build a script rebuilding a SQLite table with some columns retyped.
+
+    SQLite cannot change a column's type in place (and its type affinity
+    would keep integers written into a VARCHAR column as text), so the rows
+    are copied into a new table built from the reflected definition, with
+    its indexes recreated. ``retypes`` maps column name to
+    (new type, {old value: new value}). The script runs in one transaction.
+    """
+    metadata = MetaData()
+    old = Table(table_name, metadata, autoload_with=engine)
+    rebuilt = MetaData()
+    for table in metadata.sorted_tables:
+        table.to_metadata(rebuilt)
+    new = rebuilt.tables[table_name]
+    for column, (type_, _) in retypes.items():
+        new.c[column].type = type_
+    
+    dialect = engine.dialect
+    quote = dialect.identifier_preparer.quote
+    backup = f"_{table_name}_old"
+    columns = [quote(column.name) for column in old.columns]
+    selects = [
+        _case_sql(quoted, retypes[column.name][1]) if column.name in retypes else quoted
+        for column, quoted in zip(old.columns, columns)
+    ]
+    statements = [
+        "BEGIN",
+        *(f"DROP INDEX {index.name}" for index in old.indexes),
+        f"ALTER TABLE {table_name} RENAME TO {backup}",
+        str(CreateTable(new).compile(dialect=dialect)),
+        *(str(CreateIndex(index).compile(dialect=dialect)) for index in new.indexes),
+        f"INSERT INTO {table_name} ({', '.join(columns)}) SELECT {', '.join(selects)} FROM {backup}",
+        f"DROP TABLE {backup}",
+        "COMMIT",
+    ]
+    return ";\n".join(statements) + ";"
+
+
+class ServerStatusValuesMigration(Migration):
+    """Store server status as the lowercase enum values instead of member names.
+
+    On PostgreSQL this also swaps the native ``serverstatus`` type for the
+    ``server_status`` type the model now declares. Databases created with the
+    current models already use the values, so the migration is a no-op there.
+    """
+
+    _STATUSES = ("creating", "running", "stopped", "error", "removing")
+
+    def __init__(self):
+        super().__init__("002", "Store server status as lowercase enum values")
+
+    def up(self):
+        """Convert status names such as 'RUNNING' to values such as 'running'."""
+        self._convert("serverstatus", "server_status", "lower", self._STATUSES)
+
+    def down(self):
+        """Convert status values back to member names."""
+        names = tuple(status.upper() for status in self._STATUSES)
+        self._convert("server_status", "serverstatus", "upper", names)
+
+    def _convert(self, old_type, new_type, case_function, labels):
+        if not _has_table("server_instances"):
+            return
+
+        with engine.begin() as conn:
+            if engine.dialect.name != "postgresql":
+                conn.execute(text(
+                    f"UPDATE server_instances SET status = {case_function}(status) "
+                    f"WHERE status <> {case_function}(status)"
+                ))
+                return
+
+            if not _pg_type_exists(conn, old_type):
+                return
+            if not _pg_type_exists(conn, new_type):
+                conn.exec_driver_sql(
+                    f"CREATE TYPE {new_type} AS ENUM ({', '.join(repr(label) for label in labels)})"
+                )
+            conn.exec_driver_sql(
+                f"ALTER TABLE server_instances ALTER COLUMN status TYPE {new_type} "
+                f"USING {case_function}(status::text)::{new_type}"
+            )
+            conn.exec_driver_sql(f"DROP TYPE {old_type}")
+
+
+class ConfigurationEnumCodesMigration(Migration):
+    """Store configuration entry enums as SMALLINT codes instead of member names.
+
+    Existing names are mapped through the models' ``_CONFIG_TYPE_CODES`` and
+    ``_UI_CONTROL_CODES``, so entries survive the upgrade. On PostgreSQL the
+    old native ``configtype``/``uicontroltype`` types are dropped. Databases
+    created with the current models already store codes and are left alone.
+    """
+
+    # column -> (PostgreSQL type from the old Enum column, {member name: code})
+    _COLUMNS = {
+        "value_type": ("configtype", {member.name: code for member, code in _CONFIG_TYPE_CODES.items()}),
+        "ui_control": ("uicontroltype", {member.name: code for member, code in _UI_CONTROL_CODES.items()}),
+    }
+
+    def __init__(self):
+        super().__init__("003", "Store configuration entry enums as integer codes")
+
+    def up(self):
+        """Convert member names such as 'INTEGER' to their stored codes."""
+        if not self._stores_codes(False):
+            return
+        
+        if engine.dialect.name != "postgresql":
+            run_ddl_script(_sqlite_rebuild_script("configuration_entries", {
+                column: (SmallInteger(), codes) for column, (_, codes) in self._COLUMNS.items()
+            }))
+            return
+        
+        with engine.begin() as conn:
+            for column, (type_name, codes) in self._COLUMNS.items():
+                conn.exec_driver_sql(
+                    f"ALTER TABLE configuration_entries ALTER COLUMN {column} TYPE SMALLINT "
+                    f"USING {_case_sql(f'{column}::text', codes)}"
+                )
+                conn.exec_driver_sql(f"DROP TYPE IF EXISTS {type_name}")
+
+    def down(self):
+        """Convert stored codes back to member names."""
+        if not self._stores_codes(True):
+            return
+        
+        if engine.dialect.name != "postgresql":
+            run_ddl_script(_sqlite_rebuild_script("configuration_entries", {
+                column: (String(max(map(len, codes))), {code: name for name, code in codes.items()})
+                for column, (_, codes) in self._COLUMNS.items()
+            }))
+            return
+        
+        with engine.begin() as conn:
+            for column, (type_name, codes) in self._COLUMNS.items():
+                labels = ", ".join(repr(name) for name in codes)
+                conn.exec_driver_sql(f"CREATE TYPE {type_name} AS ENUM ({labels})")
+                names = {code: name for name, code in codes.items()}
+                conn.exec_driver_sql(
+                    f"ALTER TABLE configuration_entries ALTER COLUMN {column} TYPE {type_name} "
+                    f"USING ({_case_sql(column, names)})::{type_name}"
+                )
+
+    def _stores_codes(self, expected: bool) -> bool:
+        """Check whether the entry table exists and its enums are (or aren't) codes."""
+        if not _has_table("configuration_entries"):
+            return False
+        types = {col["name"]: col["type"] for col in inspect(engine).get_columns("configuration_entries")}
+        return isinstance(types["value_type"], Integer) == expected
+
+
 # Global migration manager instance
 migration_manager = MigrationManager()
 
-# Register initial migration
+# Register migrations
 migration_manager.register_migration(InitialMigration())
+migration_manager.register_migration(ServerStatusValuesMigration())
+migration_manager.register_migration(ConfigurationEnumCodesMigration())
 
 
 if __name__ == "__main__":
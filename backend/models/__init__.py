@@ -1,12 +1,32 @@
-"""Database models for ContainerCraft."""
+"""Database models for ContainerCraft.
+
+The mapped classes are imported on first access, so importing ``models.base``
+(e.g. from database.py's CLI) does not pay for loading the model modules.
+"""
+
+import importlib
 
 from .base import Base
-from .server import ServerInstance
-from .configuration import ConfigurationTemplate, ConfigurationEntry
+
+# Public name -> submodule defining it
+_LAZY_EXPORTS = {
+    "ServerInstance": "server",
+    "ServerInstanceDTO": "server",
+    "ConfigurationTemplate": "configuration",
+    "ConfigurationEntry": "configuration",
+}
 
 __all__ = [
     "Base",
     "ServerInstance", 
+    "ServerInstanceDTO",
     "ConfigurationTemplate",
     "ConfigurationEntry"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
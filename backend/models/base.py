@@ -1,26 +1,84 @@
 """Base database model configuration."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+import time
+import uuid
+import orjson
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./containercraft.db")
 
+_url = make_url(DATABASE_URL)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+IS_MEMORY_DB = IS_SQLITE and _url.database in (None, "", ":memory:")
+
+# Pool sizing only applies to queue-pooled engines (not in-memory SQLite)
+pool_options = {} if IS_MEMORY_DB else {"pool_size": 10, "max_overflow": 20}
+
+
+def _json_serializer(value):
+    """Serialize JSON column values with orjson (SQLAlchemy expects str)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# JSON column (de)serialization, shared by every engine the app creates
+JSON_ENGINE_OPTIONS = {
+    "json_serializer": _json_serializer,
+    "json_deserializer": orjson.loads,
+}
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Enable WAL and relaxed fsync so readers don't block the writer.
+
+    Also turns on foreign key enforcement, which SQLite leaves off by
+    default, so ON DELETE CASCADE rules are honoured. Register it as a
+    "connect" listener on SQLite engines.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 # Create engine with SQLite-specific configuration
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=os.getenv("DEBUG", "false").lower() == "true"
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    echo=os.getenv("DEBUG", "false").lower() == "true",
+    pool_pre_ping=True,
+    **JSON_ENGINE_OPTIONS,
+    **pool_options
 )
 
+if IS_SQLITE:
+    event.listen(engine, "connect", set_sqlite_pragmas)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create declarative base
 Base = declarative_base()
 
+def uuid7():
+    """Generate a time-ordered UUID (RFC 9562 version 7).
+
+    The leading 48 bits are the Unix timestamp in milliseconds, so new
+    primary keys land at the end of the index instead of at random pages.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
 def get_db():
     """Dependency to get database session."""
     db = SessionLocal()
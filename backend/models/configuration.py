@@ -1,16 +1,16 @@
 """Configuration models for templates and entries."""
 
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, JSON, ForeignKey, Float, Text, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, JSON, ForeignKey, Float, Text, UniqueConstraint, Uuid
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-import uuid
+from sqlalchemy.orm import relationship, deferred
 import enum
-from .base import Base
+from .base import Base, uuid7
+from .serialization import DictSerializable, enum_value, identity, iso_or_none
+from .types import EnumCode
 
 
 class ConfigType(enum.Enum):
-    """Configuration value type enumeration."""
+    """Configuration value type enumeration (stored via _CONFIG_TYPE_CODES)."""
     STRING = "string"
     INTEGER = "integer"
     FLOAT = "float"
@@ -19,7 +19,7 @@ class ConfigType(enum.Enum):
 
 
 class UIControlType(enum.Enum):
-    """UI control type enumeration."""
+    """UI control type enumeration (stored via _UI_CONTROL_CODES)."""
     INPUT = "input"
     SLIDER = "slider"
     TOGGLE = "toggle"
@@ -27,52 +27,91 @@ class UIControlType(enum.Enum):
     TEXTAREA = "textarea"
 
 
-class ConfigurationTemplate(Base):
+# Stored integer codes for the enums above; never change or reuse a code,
+# give new members the next unused one
+_CONFIG_TYPE_CODES = {
+    ConfigType.STRING: 0,
+    ConfigType.INTEGER: 1,
+    ConfigType.FLOAT: 2,
+    ConfigType.BOOLEAN: 3,
+    ConfigType.ENUM: 4,
+}
+
+_UI_CONTROL_CODES = {
+    UIControlType.INPUT: 0,
+    UIControlType.SLIDER: 1,
+    UIControlType.TOGGLE: 2,
+    UIControlType.DROPDOWN: 3,
+    UIControlType.TEXTAREA: 4,
+}
+
+
+_TRUE_VALUES = frozenset(('true', '1', 'yes', 'on'))
+
+
+# Value converters keyed by type; types not listed are returned unchanged
+_TYPE_CONVERTERS = {
+    ConfigType.BOOLEAN: lambda value: value.lower() in _TRUE_VALUES,
+    ConfigType.INTEGER: int,
+    ConfigType.FLOAT: float,
+}
+
+_NUMERIC_TYPES = frozenset((ConfigType.INTEGER, ConfigType.FLOAT))
+
+# (empty message, too-long message, max length, allow whitespace-only) for
+# the file_path, key and value fields checked by validate_entry_fields
+_ENTRY_TEXT_RULES = (
+    ("File path cannot be empty", "File path cannot exceed 500 characters", 500, False),
+    ("Configuration key cannot be empty", "Configuration key cannot exceed 255 characters", 255, False),
+    ("Configuration value cannot be empty", "Configuration value cannot exceed 1000 characters", 1000, True),
+)
+
+# Serializers used by set_typed_value; types not listed fall back to str()
+_TYPE_SERIALIZERS = {
+    ConfigType.BOOLEAN: lambda value: str(bool(value)).lower(),
+}
+
+
+class ConfigurationTemplate(DictSerializable, Base):
     """Configuration template model for saving and reusing server configurations."""
     
     __tablename__ = "configuration_templates"
     
     # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
     
     # Template information
     name = Column(String(255), nullable=False)
-    description = Column(Text, nullable=True)
+    description = deferred(Column(Text, nullable=True), group="details")
     modpack_id = Column(Integer, nullable=False)
     
-    # Configuration data stored as JSON
-    config_data = Column(JSON, nullable=False)
+    # Configuration data stored as JSON (deferred; use undefer_group("details"))
+    config_data = deferred(Column(JSON, nullable=False), group="details")
     
     # Template metadata
     is_default = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    # Relationships
-    servers = relationship("ServerInstance", back_populates="configuration_template")
+    # Relationships (lazy="raise" surfaces N+1 access; eager-load explicitly)
+    servers = relationship("ServerInstance", back_populates="configuration_template", lazy="raise")
+    
+    # to_dict converters; other columns pass through. to_dict reads the
+    # deferred "details" columns, so load them with undefer_group("details")
+    # to avoid an extra SELECT per row
+    _DICT_COERCE = {"id": str, "created_at": iso_or_none}
     
     def __repr__(self):
         return f"<ConfigurationTemplate(id={self.id}, name='{self.name}', modpack_id={self.modpack_id})>"
     
-    def to_dict(self):
-        """Convert configuration template to dictionary."""
-        return {
-            "id": str(self.id),
-            "name": self.name,
-            "description": self.description,
-            "modpack_id": self.modpack_id,
-            "config_data": self.config_data,
-            "is_default": self.is_default,
-            "created_at": self.created_at.isoformat() if self.created_at else None
-        }
-    
     def validate(self):
         """Validate configuration template data."""
         errors = []
         
         # Validate name
-        if not self.name or len(self.name.strip()) == 0:
+        name = self.name
+        if not name or name.isspace():
             errors.append("Template name cannot be empty")
-        elif len(self.name) > 255:
+        elif len(name) > 255:
             errors.append("Template name cannot exceed 255 characters")
         
         # Validate modpack_id
@@ -90,16 +129,16 @@ class ConfigurationTemplate(Base):
         return errors
 
 
-class ConfigurationEntry(Base):
+class ConfigurationEntry(DictSerializable, Base):
     """Individual configuration entry for a server."""
     
     __tablename__ = "configuration_entries"
     
     # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
     
     # Foreign key to server
-    server_id = Column(UUID(as_uuid=True), ForeignKey("server_instances.id"), nullable=False)
+    server_id = Column(Uuid(as_uuid=True), ForeignKey("server_instances.id", ondelete="CASCADE"), nullable=False)
     
     # Configuration file information
     file_path = Column(String(500), nullable=False)
@@ -107,10 +146,10 @@ class ConfigurationEntry(Base):
     
     # Configuration value and metadata
     value = Column(String(1000), nullable=False)
-    value_type = Column(Enum(ConfigType), nullable=False)
+    value_type = Column(EnumCode(ConfigType, _CONFIG_TYPE_CODES), nullable=False)
     
     # UI control information
-    ui_control = Column(Enum(UIControlType), nullable=False)
+    ui_control = Column(EnumCode(UIControlType, _UI_CONTROL_CODES), nullable=False)
     min_value = Column(Float, nullable=True)
     max_value = Column(Float, nullable=True)
     options = Column(JSON, nullable=True)  # For dropdown options
@@ -119,92 +158,108 @@ class ConfigurationEntry(Base):
     description = Column(Text, nullable=True)
     category = Column(String(100), nullable=True)
     
-    # Relationships
-    server = relationship("ServerInstance", back_populates="configuration_entries")
+    # Relationships (lazy="raise" surfaces N+1 access; eager-load explicitly)
+    server = relationship("ServerInstance", back_populates="configuration_entries", lazy="raise")
+    
+    # to_dict converters; other columns pass through
+    _DICT_COERCE = {
+        "id": str,
+        "server_id": str,
+        "value_type": enum_value,
+        "ui_control": enum_value,
+    }
     
-    # Composite unique constraint on server_id, file_path, and key
+    # Composite unique constraint on server_id, file_path, and key; its
+    # leading server_id column also serves per-server entry lookups
     __table_args__ = (
+        UniqueConstraint("server_id", "file_path", "key", name="uq_entry_skey"),
         {"sqlite_autoincrement": True}
     )
     
     def __repr__(self):
         return f"<ConfigurationEntry(id={self.id}, key='{self.key}', value='{self.value}')>"
     
-    def to_dict(self):
-        """Convert configuration entry to dictionary."""
-        return {
-            "id": str(self.id),
-            "server_id": str(self.server_id),
-            "file_path": self.file_path,
-            "key": self.key,
-            "value": self.value,
-            "value_type": self.value_type.value,
-            "ui_control": self.ui_control.value,
-            "min_value": self.min_value,
-            "max_value": self.max_value,
-            "options": self.options,
-            "description": self.description,
-            "category": self.category
-        }
-    
     @property
     def typed_value(self):
-        """Get the value converted to its proper type."""
-        if self.value_type == ConfigType.BOOLEAN:
-            return self.value.lower() in ('true', '1', 'yes', 'on')
-        elif self.value_type == ConfigType.INTEGER:
-            return int(self.value)
-        elif self.value_type == ConfigType.FLOAT:
-            return float(self.value)
-        else:
-            return self.value
+        """Get the value converted to its proper type.
+
+        The result is cached alongside the exact value and type objects it
+        was computed from, so any assignment, refresh or expiry of either
+        column misses the cache without needing invalidation hooks.
+        """
+        value, value_type = self.value, self.value_type
+        cached = self.__dict__.get("_typed_value_cache")
+        if cached is not None and cached[0] is value and cached[1] is value_type:
+            return cached[2]
+        result = convert_typed_value(value, value_type)
+        self.__dict__["_typed_value_cache"] = (value, value_type, result)
+        return result
     
     def set_typed_value(self, value):
         """Set the value from a typed value."""
-        if self.value_type == ConfigType.BOOLEAN:
-            self.value = str(bool(value)).lower()
-        else:
-            self.value = str(value)
+        self.value = _TYPE_SERIALIZERS.get(self.value_type, str)(value)
     
     def validate(self):
         """Validate configuration entry data."""
-        errors = []
-        
-        # Validate file_path
-        if not self.file_path or len(self.file_path.strip()) == 0:
-            errors.append("File path cannot be empty")
-        elif len(self.file_path) > 500:
-            errors.append("File path cannot exceed 500 characters")
-        
-        # Validate key
-        if not self.key or len(self.key.strip()) == 0:
-            errors.append("Configuration key cannot be empty")
-        elif len(self.key) > 255:
-            errors.append("Configuration key cannot exceed 255 characters")
-        
-        # Validate value
-        if not self.value:
-            errors.append("Configuration value cannot be empty")
-        elif len(self.value) > 1000:
-            errors.append("Configuration value cannot exceed 1000 characters")
-        
-        # Validate value type consistency
+        return validate_entry_fields(
+            file_path=self.file_path,
+            key=self.key,
+            value=self.value,
+            value_type=self.value_type,
+            ui_control=self.ui_control,
+            min_value=self.min_value,
+            max_value=self.max_value,
+            options=self.options
+        )
+
+
+def convert_typed_value(value, value_type):
+    """Convert a raw configuration value string to its proper type."""
+    return _TYPE_CONVERTERS.get(value_type, identity)(value)
+
+
+def validate_entry_fields(file_path, key, value, value_type, ui_control,
+                          min_value=None, max_value=None, options=None, **_):
+    """Validate configuration entry data without instantiating a model.
+
+    Accepts the same fields as ``ConfigurationEntry`` so plain dicts destined
+    for bulk inserts can be checked with ``validate_entry_fields(**values)``.
+    """
+    errors = []
+    append = errors.append
+    
+    # Validate file_path, key and value against their length limits
+    for text, (empty_msg, too_long_msg, max_len, allow_blank) in zip(
+            (file_path, key, value), _ENTRY_TEXT_RULES):
+        if not text or (not allow_blank and text.isspace()):
+            append(empty_msg)
+        elif len(text) > max_len:
+            append(too_long_msg)
+    
+    # Validate value type consistency (string-like types need no conversion)
+    converter = _TYPE_CONVERTERS.get(value_type)
+    if converter is not None:
         try:
-            typed_value = self.typed_value
+            converter(value)
         except (ValueError, TypeError) as e:
-            errors.append(f"Value '{self.value}' is not valid for type {self.value_type.value}: {e}")
-        
-        # Validate numeric ranges
-        if self.value_type in [ConfigType.INTEGER, ConfigType.FLOAT]:
-            if self.min_value is not None and self.max_value is not None:
-                if self.min_value >= self.max_value:
-                    errors.append("Minimum value must be less than maximum value")
-        
-        # Validate dropdown options
-        if self.ui_control == UIControlType.DROPDOWN:
-            if not self.options or not isinstance(self.options, list) or len(self.options) == 0:
-                errors.append("Dropdown control must have at least one option")
-            elif self.value not in self.options:
-                errors.append(f"Value '{self.value}' is not in the list of valid options")
-        
-        return errors
\ No newline at end of file
+            append(f"Value '{value}' is not valid for type {value_type.value}: {e}")
+    
+    # Validate numeric ranges
+    if value_type in _NUMERIC_TYPES:
+        if min_value is not None and max_value is not None:
+            if min_value >= max_value:
+                append("Minimum value must be less than maximum value")
+    
+    # Validate dropdown options
+    if ui_control == UIControlType.DROPDOWN:
+        if not options or not isinstance(options, list):
+            append("Dropdown control must have at least one option")
+        elif value not in options:
+            append(f"Value '{value}' is not in the list of valid options")
+    
+    return errors
+
+
+# Registers ServerInstance for the string relationship targets above; imported
+# last because server.py imports this module
+from . import server  # noqa: E402,F401
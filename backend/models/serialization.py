@@ -0,0 +1,99 @@
+"""Column-to-dict serialization shared by the models.
+
+Each model lists per-column converters in ``_DICT_COERCE`` (columns not
+listed pass through unchanged) and hidden columns in ``_DICT_EXCLUDE``.
+``DictSerializable`` turns that into a generated ``to_dict`` per class.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+
+def identity(value):
+    return value
+
+
+def str_or_none(value):
+    return str(value) if value else None
+
+
+def enum_value(value):
+    return value.value
+
+
+def enum_value_or_none(value):
+    return value.value if value else None
+
+
+def iso_or_none(value, isoformat=datetime.isoformat):
+    return None if value is None else isoformat(value)
+
+
+def compile_to_dict(columns):
+    """Generate a straight-line to_dict function for (key, converter) pairs.
+
+    Plain columns are read directly; only converted ones call a helper. The
+    fast path reads the instance dict; if any column is expired, deferred or
+    unloaded, every value is fetched through the attribute descriptors instead.
+    """
+    namespace = {"_keys": frozenset(key for key, _ in columns)}
+    items = []
+    for key, convert in columns:
+        if convert is identity:
+            items.append(f"        {key!r}: values[{key!r}],")
+        else:
+            namespace[f"_convert_{key}"] = convert
+            items.append(f"        {key!r}: _convert_{key}(values[{key!r}]),")
+    source = "\n".join([
+        "def to_dict(self):",
+        "    values = self.__dict__",
+        "    if not _keys <= values.keys():",
+        "        values = {key: values[key] if key in values else getattr(self, key) for key in _keys}",
+        "    return {",
+        *items,
+        "    }",
+    ])
+    exec(source, namespace)
+    return namespace["to_dict"]
+
+
+class DictSerializable:
+    """Mixin giving a mapped class ``to_dict``/``to_dicts`` from its columns."""
+
+    # Per-column converters and columns never exposed; overridden per model
+    _DICT_COERCE = {}
+    _DICT_EXCLUDE = frozenset()
+
+    @classmethod
+    def _column_keys(cls):
+        """Get (column key, converter) pairs for to_dict, computed once per class."""
+        columns = cls.__dict__.get("_dict_columns")
+        if columns is None:
+            coerce = cls._DICT_COERCE
+            columns = tuple(
+                (key, coerce.get(key, identity))
+                for key in inspect(cls).column_attrs.keys()
+                if key not in cls._DICT_EXCLUDE
+            )
+            cls._dict_columns = columns
+        return columns
+
+    def to_dict(self):
+        """Convert the model's columns to a dictionary."""
+        # The first call generates the specialised function and installs it
+        # on the class, so later calls go straight to the generated code
+        return _install_to_dict(type(self))(self)
+
+    @classmethod
+    def to_dicts(cls, rows):
+        """Convert a batch of instances to dictionaries."""
+        to_dict = cls.__dict__.get("to_dict") or _install_to_dict(cls)
+        return [to_dict(row) for row in rows]
+
+
+def _install_to_dict(cls):
+    to_dict = compile_to_dict(cls._column_keys())
+    to_dict.__doc__ = DictSerializable.to_dict.__doc__
+    cls.to_dict = to_dict
+    return to_dict
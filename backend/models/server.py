@@ -1,12 +1,24 @@
-"""Server instance model."""
+"""Server instance model.
 
-from sqlalchemy import Column, String, Integer, DateTime, Enum, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+Configuration entries are eager: they are fetched with one ``SELECT ... IN``
+per batch of servers. The template relationship is view-only and raises if
+accessing it would emit SQL, so callers that need it must ask for it with
+``selectinload(ServerInstance.configuration_template)`` (or ``joinedload``).
+Code paths that must not touch relationships at all (e.g. list endpoints
+that only need columns) should add ``.options(raiseload("*"))`` to their
+query so any accidental lazy load raises instead of silently issuing N+1
+queries.
+"""
+
+from sqlalchemy import CheckConstraint, Column, String, Integer, DateTime, Enum, ForeignKey, Index, insert, lambda_stmt, select, text, Uuid
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-import uuid
+from dataclasses import dataclass
+from typing import Optional
 import enum
-from .base import Base
+from .base import Base, uuid7
+from . import configuration  # noqa: F401  (registers the relationship targets)
+from .serialization import DictSerializable, enum_value_or_none, iso_or_none, str_or_none
 
 
 class ServerStatus(enum.Enum):
@@ -18,13 +30,88 @@ class ServerStatus(enum.Enum):
     REMOVING = "removing"
 
 
-class ServerInstance(Base):
+_RUNNING = ServerStatus.RUNNING
+_STOPPED = ServerStatus.STOPPED
+
+
+def _enum_values(enum_class):
+    return [member.value for member in enum_class]
+
+
+# Per-column converters used by ServerInstance.to_dict; others pass through
+_COERCE = {
+    "id": str_or_none,
+    "configuration_id": str_or_none,
+    "status": enum_value_or_none,
+    "created_at": iso_or_none,
+    "updated_at": iso_or_none,
+}
+
+
+def _nonblank(text):
+    return bool(text) and not text.isspace()
+
+
+def _port_in_range(port, isinstance=isinstance, int=int):
+    return isinstance(port, int) and 1024 <= port <= 65535
+
+
+# (rule, check returning True when valid, error message) in reporting order;
+# length checks only apply once the field is known to be non-blank
+_VALIDATORS = (
+    ("name_nonempty", lambda s: _nonblank(s.name),
+     "Server name cannot be empty"),
+    ("name_length", lambda s, len=len: not _nonblank(s.name) or len(s.name) <= 255,
+     "Server name cannot exceed 255 characters"),
+    ("modpack_id", lambda s, isinstance=isinstance, int=int: isinstance(s.modpack_id, int) and s.modpack_id > 0,
+     "Modpack ID must be a positive integer"),
+    ("modpack_version_nonempty", lambda s: _nonblank(s.modpack_version),
+     "Modpack version cannot be empty"),
+    ("modpack_version_length", lambda s, len=len: not _nonblank(s.modpack_version) or len(s.modpack_version) <= 50,
+     "Modpack version cannot exceed 50 characters"),
+    ("port_range", lambda s: _port_in_range(s.port),
+     "Server port must be between 1024 and 65535"),
+    ("rcon_port_range", lambda s: _port_in_range(s.rcon_port),
+     "RCON port must be between 1024 and 65535"),
+    ("ports_distinct", lambda s: s.port != s.rcon_port,
+     "Server port and RCON port cannot be the same"),
+    ("rcon_password_length", lambda s, len=len: len(s.rcon_password or "") >= 8,
+     "RCON password must be at least 8 characters long"),
+)
+
+
+@dataclass(frozen=True)
+class ServerInstanceDTO:
+    """Read-only API view of a server; fields match ServerInstance.to_dict.
+
+    orjson serializes it natively.
+    """
+    # Spelled out rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = (
+        "id", "name", "modpack_id", "modpack_version", "container_id", "status",
+        "port", "rcon_port", "created_at", "updated_at", "configuration_id",
+    )
+    
+    id: Optional[str]
+    name: str
+    modpack_id: int
+    modpack_version: str
+    container_id: Optional[str]
+    status: Optional[str]
+    port: int
+    rcon_port: int
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    configuration_id: Optional[str]
+
+
+class ServerInstance(DictSerializable, Base):
     """Server instance model representing a deployed Minecraft server."""
     
     __tablename__ = "server_instances"
     
-    # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Primary key (time-ordered, so new rows append to the index)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid7)
     
     # Basic server information
     name = Column(String(255), nullable=False, unique=True)
@@ -35,11 +122,18 @@ class ServerInstance(Base):
     container_id = Column(String(255), nullable=True)  # Nullable until container is created
     
     # Server status
-    status = Column(Enum(ServerStatus), nullable=False, default=ServerStatus.CREATING)
+    # Native "server_status" ENUM on PostgreSQL (VARCHAR elsewhere) holding the
+    # lowercase member values, so raw SQL can filter on e.g. status = 'running'
+    status = Column(
+        Enum(ServerStatus, name="server_status", values_callable=_enum_values),
+        nullable=False,
+        default=ServerStatus.CREATING
+    )
     
     # Network configuration
-    port = Column(Integer, nullable=False, unique=True)
-    rcon_port = Column(Integer, nullable=False, unique=True)
+    # Uniqueness is enforced by partial indexes in __table_args__
+    port = Column(Integer, nullable=False)
+    rcon_port = Column(Integer, nullable=False)
     rcon_password = Column(String(255), nullable=False)
     
     # Timestamps
@@ -47,73 +141,121 @@ class ServerInstance(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Foreign key to configuration template (optional)
-    configuration_id = Column(UUID(as_uuid=True), ForeignKey("configuration_templates.id"), nullable=True)
+    configuration_id = Column(Uuid(as_uuid=True), ForeignKey("configuration_templates.id"), nullable=True)
     
     # Relationships
-    configuration_template = relationship("ConfigurationTemplate", back_populates="servers")
-    configuration_entries = relationship("ConfigurationEntry", back_populates="server", cascade="all, delete-orphan")
+    # Read-only view of configuration_id; set the FK column to change it
+    configuration_template = relationship(
+        "ConfigurationTemplate", back_populates="servers", viewonly=True, lazy="raise_on_sql"
+    )
+    configuration_entries = relationship(
+        "ConfigurationEntry", back_populates="server", cascade="all, delete-orphan",
+        lazy="selectin", passive_deletes=True
+    )
+    
+    # Status listings are served from (status, created_at); running servers
+    # also get a small partial index for the common "what's up" query.
+    # Ports only need to be unique among servers that aren't being removed,
+    # so a teardown doesn't hold its ports and removing rows stay unindexed.
+    # The CHECKs mirror validate() so bulk inserts are guarded by the database
+    __table_args__ = (
+        CheckConstraint("port BETWEEN 1024 AND 65535", name="ck_port_range"),
+        CheckConstraint("rcon_port BETWEEN 1024 AND 65535", name="ck_rcon_range"),
+        CheckConstraint("port <> rcon_port", name="ck_ports_distinct"),
+        CheckConstraint("length(name) > 0", name="ck_name_nonempty"),
+        Index("ix_server_status_created", "status", "created_at"),
+        Index(
+            "ix_server_running", "id",
+            postgresql_where=text("status = 'running'"),
+            sqlite_where=text("status = 'running'")
+        ),
+        Index(
+            "uq_server_port_active", "port", unique=True,
+            postgresql_where=text("status != 'removing'"),
+            sqlite_where=text("status != 'removing'")
+        ),
+        Index(
+            "uq_server_rcon_port_active", "rcon_port", unique=True,
+            postgresql_where=text("status != 'removing'"),
+            sqlite_where=text("status != 'removing'")
+        ),
+    )
+    
+    # to_dict converters, and columns it never exposes
+    _DICT_COERCE = _COERCE
+    _DICT_EXCLUDE = frozenset(["rcon_password"])
     
     def __repr__(self):
-        return f"<ServerInstance(id={self.id}, name='{self.name}', status='{self.status.value}')>"
+        status = self.status
+        status_value = status.value if status is not None else None
+        return f"<ServerInstance(id={self.id}, name='{self.name}', status='{status_value}')>"
     
     @property
     def is_running(self):
         """Check if server is in running state."""
-        return self.status == ServerStatus.RUNNING
+        return self.status is _RUNNING
     
     @property
     def is_stopped(self):
         """Check if server is stopped."""
-        return self.status == ServerStatus.STOPPED
-    
-    def to_dict(self):
-        """Convert server instance to dictionary."""
-        return {
-            "id": str(self.id),
-            "name": self.name,
-            "modpack_id": self.modpack_id,
-            "modpack_version": self.modpack_version,
-            "container_id": self.container_id,
-            "status": self.status.value if self.status else None,
-            "port": self.port,
-            "rcon_port": self.rcon_port,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "configuration_id": str(self.configuration_id) if self.configuration_id else None
-        }
+        return self.status is _STOPPED
+    
+    def to_dto(self):
+        """Convert server instance to a ServerInstanceDTO."""
+        values = self.__dict__
+        return ServerInstanceDTO(**{
+            key: convert(values[key] if key in values else getattr(self, key))
+            for key, convert in self._column_keys()
+        })
+    
+    @classmethod
+    def get_by_id(cls, session, server_id):
+        """Fetch a server by primary key through the lambda statement cache."""
+        stmt = lambda_stmt(lambda: select(cls).where(cls.id == server_id))
+        return session.execute(stmt).scalar_one_or_none()
+    
+    @classmethod
+    def bulk_create(cls, session, rows):
+        """Insert servers from plain dicts in one executemany; return ids in order.
+
+        Skips ORM instances (and validate()), relying on the table's defaults
+        and constraints. The caller owns the transaction and commits.
+        """
+        if not rows:
+            return []
+        table = cls.__table__
+        stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        return session.execute(stmt, rows).scalars().all()
+    
+    @classmethod
+    def list_as_dicts(cls, session, limit=100, offset=0):
+        """List servers as to_dict-style dicts without building ORM instances."""
+        columns = cls._column_keys()
+        stmt = (
+            select(*[getattr(cls, key) for key, _ in columns])
+            .order_by(cls.created_at, cls.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [
+            {key: convert(row[key]) for key, convert in columns}
+            for row in session.execute(stmt).mappings()
+        ]
     
     def validate(self):
         """Validate server instance data."""
         errors = []
+        append = errors.append
         
-        # Validate name
-        if not self.name or len(self.name.strip()) == 0:
-            errors.append("Server name cannot be empty")
-        elif len(self.name) > 255:
-            errors.append("Server name cannot exceed 255 characters")
+        for _, check, message in _VALIDATORS:
+            if not check(self):
+                append(message)
         
-        # Validate modpack_id
-        if not isinstance(self.modpack_id, int) or self.modpack_id <= 0:
-            errors.append("Modpack ID must be a positive integer")
-        
-        # Validate modpack_version
-        if not self.modpack_version or len(self.modpack_version.strip()) == 0:
-            errors.append("Modpack version cannot be empty")
-        elif len(self.modpack_version) > 50:
-            errors.append("Modpack version cannot exceed 50 characters")
-        
-        # Validate ports
-        if not isinstance(self.port, int) or not (1024 <= self.port <= 65535):
-            errors.append("Server port must be between 1024 and 65535")
-        
-        if not isinstance(self.rcon_port, int) or not (1024 <= self.rcon_port <= 65535):
-            errors.append("RCON port must be between 1024 and 65535")
-        
-        if self.port == self.rcon_port:
-            errors.append("Server port and RCON port cannot be the same")
-        
-        # Validate RCON password
-        if not self.rcon_password or len(self.rcon_password) < 8:
-            errors.append("RCON password must be at least 8 characters long")
-        
-        return errors
\ No newline at end of file
+        return errors
+    
+    def is_valid(self):
+        """Check validity, stopping at the first failing rule."""
+        for _, check, _ in _VALIDATORS:
+            if not check(self):
+                return False
+        return True
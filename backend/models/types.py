@@ -0,0 +1,40 @@
+"""Custom column types shared by the models."""
+
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class EnumCode(TypeDecorator):
+    """Store a Python enum as a small integer code instead of its name.
+
+    Codes come from an explicit ``{member: code}`` map so reordering or
+    inserting enum members never changes what existing rows mean. The map
+    must cover every member with a distinct code. Values read back are enum
+    members, exactly as with ``Enum(...)``.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class, codes):
+        super().__init__()
+        missing = set(enum_class) - set(codes)
+        if missing:
+            raise ValueError(f"No stored code for {enum_class.__name__} members: {sorted(m.name for m in missing)}")
+        if len(set(codes.values())) != len(codes):
+            raise ValueError(f"Stored codes for {enum_class.__name__} must be unique")
+        self.enum_class = enum_class
+        # Kept as a tuple so the type stays hashable for the statement cache
+        self.codes = tuple(codes.items())
+        self._codes = dict(codes)
+        self._members = {code: member for member, code in codes.items()}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._codes[self.enum_class(value)]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._members[value]
@@ -2,60 +2,95 @@
 
 import sys
 import os
-from sqlalchemy.orm import sessionmaker
-from models.base import engine
+from dataclasses import asdict
+from sqlalchemy import create_engine, delete, event, func, insert, select, text
+from sqlalchemy.orm import joinedload, selectinload, sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.base import Base, JSON_ENGINE_OPTIONS, set_sqlite_pragmas, uuid7
 from models.server import ServerInstance, ServerStatus
 from models.configuration import ConfigurationTemplate, ConfigurationEntry, ConfigType, UIControlType
 
-# Create session
-Session = sessionmaker(bind=engine)
+# Throwaway in-memory database so commits never touch disk; StaticPool keeps
+# the single connection (and with it the schema) alive for the whole run.
+# It shares the app engine's JSON serializers and PRAGMAs (foreign keys on)
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+    **JSON_ENGINE_OPTIONS
+)
+event.listen(engine, "connect", set_sqlite_pragmas)
+Base.metadata.create_all(engine)
+
+# Session factory for the test; each test's session rolls back its changes
+Session = sessionmaker(bind=engine, autoflush=False)
+
+
+# (constructor kwargs, expected number of validation errors) per model
+SERVER_CASES = [
+    (dict(name="Test Server", modpack_id=12345, modpack_version="1.0.0",
+          port=25565, rcon_port=25575, rcon_password="testpassword123"), 0),
+    # Empty name, invalid ID, empty version, invalid port, same ports, short password
+    (dict(name="", modpack_id=-1, modpack_version="",
+          port=80, rcon_port=80, rcon_password="short"), 7),
+]
+
+TEMPLATE_CASES = [
+    (dict(name="Test Template", description="A test configuration template", modpack_id=12345,
+          config_data={"server.properties": {"max-players": 20, "difficulty": "normal"}}), 0),
+    # Empty name, invalid ID, config data not a dict
+    (dict(name="", modpack_id=-1, config_data="not a dict"), 3),
+]
+
+ENTRY_CASES = [
+    (dict(file_path="server.properties", key="max-players", value="20",
+          value_type=ConfigType.INTEGER, ui_control=UIControlType.SLIDER,
+          min_value=1, max_value=100), 0),
+    (dict(file_path="server.properties", key="difficulty", value="normal",
+          value_type=ConfigType.ENUM, ui_control=UIControlType.DROPDOWN,
+          options=["peaceful", "easy", "normal", "hard"]), 0),
+]
+
+# Keys ServerInstance.to_dict must produce
+SERVER_DICT_KEYS = frozenset([
+    "id", "name", "modpack_id", "modpack_version", "container_id",
+    "status", "port", "rcon_port", "created_at", "updated_at", "configuration_id"
+])
+
+
+def check_validation(model, cases):
+    """Validate each case and compare the error count; report mismatches."""
+    ok = True
+    for kwargs, expected in cases:
+        errors = model(**kwargs).validate()
+        if len(errors) != expected:
+            print(f"Expected {expected} validation errors for {kwargs}, got {len(errors)}: {errors}")
+            ok = False
+    return ok
 
 
 def test_server_instance():
     """Test ServerInstance model."""
     print("Testing ServerInstance model...")
     
-    # Test validation
-    server = ServerInstance(
-        name="Test Server",
-        modpack_id=12345,
-        modpack_version="1.0.0",
-        port=25565,
-        rcon_port=25575,
-        rcon_password="testpassword123"
-    )
-    
-    errors = server.validate()
-    if errors:
-        print(f"Validation errors: {errors}")
+    if not check_validation(ServerInstance, SERVER_CASES):
         return False
     
-    print("✓ ServerInstance validation passed")
-    
-    # Test invalid data
-    invalid_server = ServerInstance(
-        name="",  # Empty name
-        modpack_id=-1,  # Invalid ID
-        modpack_version="",  # Empty version
-        port=80,  # Invalid port
-        rcon_port=80,  # Same as server port
-        rcon_password="short"  # Too short
-    )
+    print("✓ ServerInstance validation passed and catches errors")
     
-    errors = invalid_server.validate()
-    if len(errors) != 7:  # Should have 7 validation errors
-        print(f"Expected 7 validation errors, got {len(errors)}: {errors}")
-        return False
+    # is_valid must agree with validate for every case
+    for kwargs, expected in SERVER_CASES:
+        if ServerInstance(**kwargs).is_valid() != (expected == 0):
+            print(f"is_valid disagrees with validate for {kwargs}")
+            return False
     
-    print("✓ ServerInstance validation correctly catches errors")
+    print("✓ ServerInstance is_valid matches validate")
     
     # Test to_dict
-    server_dict = server.to_dict()
-    expected_keys = ["id", "name", "modpack_id", "modpack_version", "container_id", 
-                     "status", "port", "rcon_port", "created_at", "updated_at", "configuration_id"]
-    
-    if not all(key in server_dict for key in expected_keys):
-        print(f"Missing keys in to_dict output: {set(expected_keys) - set(server_dict.keys())}")
+    server_dict = ServerInstance(**SERVER_CASES[0][0]).to_dict()
+    missing = SERVER_DICT_KEYS - server_dict.keys()
+    if missing:
+        print(f"Missing keys in to_dict output: {missing}")
         return False
     
     print("✓ ServerInstance to_dict works correctly")
@@ -66,34 +101,10 @@ def test_configuration_template():
     """Test ConfigurationTemplate model."""
     print("Testing ConfigurationTemplate model...")
     
-    # Test validation
-    template = ConfigurationTemplate(
-        name="Test Template",
-        description="A test configuration template",
-        modpack_id=12345,
-        config_data={"server.properties": {"max-players": 20, "difficulty": "normal"}}
-    )
-    
-    errors = template.validate()
-    if errors:
-        print(f"Validation errors: {errors}")
-        return False
-    
-    print("✓ ConfigurationTemplate validation passed")
-    
-    # Test invalid data
-    invalid_template = ConfigurationTemplate(
-        name="",  # Empty name
-        modpack_id=-1,  # Invalid ID
-        config_data="not a dict"  # Invalid config data
-    )
-    
-    errors = invalid_template.validate()
-    if len(errors) != 3:  # Should have 3 validation errors
-        print(f"Expected 3 validation errors, got {len(errors)}: {errors}")
+    if not check_validation(ConfigurationTemplate, TEMPLATE_CASES):
         return False
     
-    print("✓ ConfigurationTemplate validation correctly catches errors")
+    print("✓ ConfigurationTemplate validation passed and catches errors")
     return True
 
 
@@ -101,23 +112,12 @@ def test_configuration_entry():
     """Test ConfigurationEntry model."""
     print("Testing ConfigurationEntry model...")
     
-    # Test validation
-    entry = ConfigurationEntry(
-        file_path="server.properties",
-        key="max-players",
-        value="20",
-        value_type=ConfigType.INTEGER,
-        ui_control=UIControlType.SLIDER,
-        min_value=1,
-        max_value=100
-    )
-    
-    errors = entry.validate()
-    if errors:
-        print(f"Validation errors: {errors}")
+    if not check_validation(ConfigurationEntry, ENTRY_CASES):
         return False
     
-    print("✓ ConfigurationEntry validation passed")
+    print("✓ ConfigurationEntry validation passed (slider and dropdown)")
+    
+    entry = ConfigurationEntry(**ENTRY_CASES[0][0])
     
     # Test typed value conversion
     if entry.typed_value != 20:
@@ -126,6 +126,24 @@ def test_configuration_entry():
     
     print("✓ ConfigurationEntry typed_value conversion works")
     
+    # The cached conversion must follow every change to value or value_type
+    entry.value = "30"
+    if entry.typed_value != 30:
+        print(f"Expected typed_value to follow the new value 30, got {entry.typed_value!r}")
+        return False
+    
+    entry.set_typed_value(45)
+    if entry.value != "45" or entry.typed_value != 45:
+        print(f"Expected set_typed_value(45) to give 45, got {entry.value!r} -> {entry.typed_value!r}")
+        return False
+    
+    entry.value_type = ConfigType.FLOAT
+    if not isinstance(entry.typed_value, float) or entry.typed_value != 45.0:
+        print(f"Expected typed_value to follow the FLOAT type, got {entry.typed_value!r}")
+        return False
+    
+    print("✓ ConfigurationEntry typed_value cache follows value and type changes")
+    
     # Test boolean conversion
     bool_entry = ConfigurationEntry(
         file_path="server.properties",
@@ -140,23 +158,6 @@ def test_configuration_entry():
         return False
     
     print("✓ ConfigurationEntry boolean conversion works")
-    
-    # Test dropdown validation
-    dropdown_entry = ConfigurationEntry(
-        file_path="server.properties",
-        key="difficulty",
-        value="normal",
-        value_type=ConfigType.ENUM,
-        ui_control=UIControlType.DROPDOWN,
-        options=["peaceful", "easy", "normal", "hard"]
-    )
-    
-    errors = dropdown_entry.validate()
-    if errors:
-        print(f"Dropdown validation errors: {errors}")
-        return False
-    
-    print("✓ ConfigurationEntry dropdown validation works")
     return True
 
 
@@ -167,45 +168,58 @@ def test_database_operations():
     session = Session()
     
     try:
-        # Create a configuration template
-        template = ConfigurationTemplate(
-            name="Test Template",
-            description="Test configuration",
-            modpack_id=12345,
-            config_data={"test": "data"}
-        )
-        session.add(template)
-        session.commit()
+        # Insert the template, server and entry in one transaction that is
+        # rolled back at the end instead of deleting each row; RETURNING
+        # hands back the rows as ORM objects with their generated keys
+        template = session.scalars(
+            insert(ConfigurationTemplate).returning(ConfigurationTemplate),
+            [{
+                "name": "Test Template",
+                "description": "Test configuration",
+                "modpack_id": 12345,
+                "config_data": {"test": "data"}
+            }]
+        ).one()
         
-        # Create a server instance
-        server = ServerInstance(
-            name="Test Server",
-            modpack_id=12345,
-            modpack_version="1.0.0",
-            port=25565,
-            rcon_port=25575,
-            rcon_password="testpassword123",
-            configuration_id=template.id
-        )
-        session.add(server)
-        session.commit()
+        server = session.scalars(
+            insert(ServerInstance).returning(ServerInstance),
+            [{
+                "name": "Test Server",
+                "modpack_id": 12345,
+                "modpack_version": "1.0.0",
+                "port": 25565,
+                "rcon_port": 25575,
+                "rcon_password": "testpassword123",
+                "configuration_id": template.id
+            }]
+        ).one()
         
-        # Create a configuration entry
-        entry = ConfigurationEntry(
-            server_id=server.id,
-            file_path="server.properties",
-            key="max-players",
-            value="20",
-            value_type=ConfigType.INTEGER,
-            ui_control=UIControlType.SLIDER,
-            min_value=1,
-            max_value=100
+        session.execute(
+            insert(ConfigurationEntry),
+            [{
+                "server_id": server.id,
+                "file_path": "server.properties",
+                "key": "max-players",
+                "value": "20",
+                "value_type": ConfigType.INTEGER,
+                "ui_control": UIControlType.SLIDER,
+                "min_value": 1,
+                "max_value": 100
+            }]
         )
-        session.add(entry)
-        session.commit()
         
-        # Test relationships
-        loaded_server = session.query(ServerInstance).filter_by(name="Test Server").first()
+        # Test relationships, loading both in the query (one JOIN and one
+        # IN-list SELECT); refresh the server to pick up the entry inserted
+        # after its collection was loaded
+        loaded_server = session.scalars(
+            select(ServerInstance)
+            .options(
+                joinedload(ServerInstance.configuration_template),
+                selectinload(ServerInstance.configuration_entries)
+            )
+            .where(ServerInstance.name == "Test Server")
+            .execution_options(populate_existing=True)
+        ).first()
         if not loaded_server:
             print("Failed to load server from database")
             return False
@@ -220,19 +234,88 @@ def test_database_operations():
         
         print("✓ Database operations and relationships work correctly")
         
-        # Cleanup
-        session.delete(entry)
-        session.delete(server)
-        session.delete(template)
-        session.commit()
+        # Enum columns stored as integer codes must read back as members
+        stored_entry = loaded_server.configuration_entries[0]
+        if stored_entry.value_type is not ConfigType.INTEGER or stored_entry.ui_control is not UIControlType.SLIDER:
+            print(f"Enum codes not round-tripped: {stored_entry.value_type!r}, {stored_entry.ui_control!r}")
+            return False
+        
+        print("✓ Enum columns round-trip through their stored codes")
+        
+        # bulk_create returns the new ids in input order
+        names = ["Bulk Server B", "Bulk Server A"]
+        bulk_ids = ServerInstance.bulk_create(session, [
+            {"name": name, "modpack_id": 12345, "modpack_version": "1.0.0",
+             "port": 25600 + i, "rcon_port": 25700 + i, "rcon_password": "testpassword123"}
+            for i, name in enumerate(names)
+        ])
+        names_by_id = dict(session.execute(
+            select(ServerInstance.id, ServerInstance.name).where(ServerInstance.id.in_(bulk_ids))
+        ).all())
+        if [names_by_id.get(server_id) for server_id in bulk_ids] != names:
+            print(f"bulk_create ids out of order: {bulk_ids}")
+            return False
+        
+        print("✓ bulk_create ids follow input order")
+        
+        # get_by_id reuses one cached statement, so each call must still bind
+        # its own id; an unknown id finds nothing
+        found = [ServerInstance.get_by_id(session, server_id) for server_id in bulk_ids]
+        if [server and server.name for server in found] != names or ServerInstance.get_by_id(session, uuid7()) is not None:
+            print(f"get_by_id returned the wrong rows: {found}")
+            return False
         
+        print("✓ get_by_id finds each server by its own id")
+        
+        # list_as_dicts skips the ORM but must produce to_dict's output; the
+        # expired instance also takes to_dict's attribute-loading path
+        listed = {row["id"]: row for row in ServerInstance.list_as_dicts(session)}
+        session.expire(loaded_server)
+        server_dict = loaded_server.to_dict()
+        if listed.get(server_dict["id"]) != server_dict:
+            print(f"list_as_dicts and to_dict disagree: {listed.get(server_dict['id'])} != {server_dict}")
+            return False
+        
+        print("✓ list_as_dicts matches to_dict")
+        
+        # The DTO carries exactly the to_dict fields and values
+        if asdict(loaded_server.to_dto()) != server_dict:
+            print(f"to_dto and to_dict disagree: {loaded_server.to_dto()}")
+            return False
+        
+        print("✓ to_dto matches to_dict")
+        
+        # JSON columns are written by orjson, which emits compact output
+        raw_config = session.execute(
+            text("SELECT config_data FROM configuration_templates WHERE id = :id"),
+            {"id": template.id.hex}
+        ).scalar_one()
+        if raw_config != '{"test":"data"}':
+            print(f"JSON not written by orjson: {raw_config!r}")
+            return False
+        
+        print("✓ JSON columns use the orjson serializer")
+        
+        # A Core DELETE bypasses the ORM, so only the database's ON DELETE
+        # CASCADE (enforced via PRAGMA foreign_keys) can remove the entries
+        server_id = loaded_server.id
+        session.execute(delete(ServerInstance).where(ServerInstance.id == server_id))
+        orphans = session.scalar(
+            select(func.count()).select_from(ConfigurationEntry).where(ConfigurationEntry.server_id == server_id)
+        )
+        if orphans:
+            print(f"Deleting a server left {orphans} configuration entries behind")
+            return False
+        
+        print("✓ Deleting a server cascades to its configuration entries")
         return True
         
     except Exception as e:
         print(f"Database operation failed: {e}")
-        session.rollback()
         return False
     finally:
+        # Cleanup: discard everything the test inserted in one ROLLBACK
+        session.rollback()
         session.close()
 
 
@@ -263,5 +346,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # Buffer the progress output and write it out in large chunks instead
+    # of one write per line on a terminal (pipes are block-buffered already)
+    sys.stdout.reconfigure(line_buffering=False)
     success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file